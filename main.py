@@ -6,12 +6,9 @@ forecasting agent. It handles user interaction, command processing, and
 agent initialization.
 """
 
-import pandas as pd
-from src.agent import ForecastingAgent
-from colorama import init, Fore, Style
-
-# Initialize colorama
-init()
+import asyncio
+import shlex
+import sys
 
 def print_help():
     """Display available commands and their usage."""
@@ -21,7 +18,50 @@ def print_help():
     print("/bye - Exit the program")
     print("You can also ask general questions about the data or request forecasts!")
 
-def main():
+async def _handle_bye(agent, command):
+    agent.save_session()
+    print("Session saved. Goodbye!")
+    return True
+
+async def _handle_help(agent, command):
+    print_help()
+
+async def _handle_analyze(agent, command):
+    parts = shlex.split(command)
+    if len(parts) != 4:
+        print("Usage: analyze <csv_path> <target_column> <series_id_column>")
+        return
+        
+    _, csv_path, target_column, series_id_column = parts
+    analysis = agent.process_dataset(csv_path, target_column, series_id_column)
+    df = agent.current_data
+    agent.current_context = {
+        'csv_path': csv_path,
+        'target_column': target_column,
+        'series_id_column': series_id_column,
+        # Column count plus a short preview keeps prompts small for wide files
+        'data_info': f"CSV with {df.shape[0]} rows, {df.shape[1]} cols (first 10: {list(df.columns[:10])})"
+    }
+    print(agent.tools_manager.format_analysis_output(analysis))
+
+async def _handle_query(agent, command):
+    # Handle as general query
+    response = await agent.process_query(command)
+    print("\nAgent Response:")
+    print(response)
+
+# Commands matched as the whole input, so queries like "help me forecast" reach the agent
+HANDLERS = {
+    "/bye": _handle_bye,
+    "help": _handle_help,
+}
+# Commands matched on their first word, followed by arguments
+ARG_HANDLERS = {
+    "analyze": _handle_analyze,
+}
+# Anything else is a natural language query. Handlers return True to end the session.
+
+async def main_async():
     """
     Main program loop.
     
@@ -32,6 +72,18 @@ def main():
     - User interaction
     - Error handling
     """
+    # Heavy imports live here so `main.py --help` stays fast
+    from colorama import init, Fore, Style
+    from langchain_community.cache import SQLiteCache
+    from langchain_core.globals import set_llm_cache
+    from src.agent import ForecastingAgent
+    
+    # Initialize colorama
+    init()
+    
+    # Exact-match response cache shared by all LLM calls, persisted across sessions
+    set_llm_cache(SQLiteCache(database_path=".fc_agent_cache.db"))
+    
     agent = ForecastingAgent()
     agent.initialize()
     
@@ -41,37 +93,22 @@ def main():
         try:
             command = input(f"\n{Fore.GREEN}Enter command: {Style.RESET_ALL}").strip()
             
-            if command == "/bye":
-                agent.save_session()
-                print("Session saved. Goodbye!")
+            handler = HANDLERS.get(command)
+            if handler is None:
+                name = command.split(maxsplit=1)[0] if command else ""
+                handler = ARG_HANDLERS.get(name, _handle_query)
+            if await handler(agent, command):
                 break
-            elif command == "help":
-                print_help()
-            elif command.startswith("analyze"):
-                parts = command.split()
-                if len(parts) != 4:
-                    print("Usage: analyze <csv_path> <target_column> <series_id_column>")
-                    continue
-                    
-                _, csv_path, target_column, series_id_column = parts
-                df = pd.read_csv(csv_path)  # Read CSV first
-                agent.current_data = df     # Store before analysis
-                agent.current_context = {
-                    'csv_path': csv_path,
-                    'target_column': target_column,
-                    'series_id_column': series_id_column,
-                    'data_info': f"CSV with {len(df)} rows, columns: {', '.join(df.columns)}"
-                }
-                analysis = agent.process_dataset(csv_path, target_column, series_id_column)
-                print(agent.tools_manager.format_analysis_output(analysis))
-            else:
-                # Handle as general query
-                response = agent.process_query(command)
-                print("\nAgent Response:")
-                print(response)
                 
         except Exception as e:
             print(f"Error: {str(e)}")
 
+def main():
+    """Run the interactive agent until the user exits."""
+    if len(sys.argv) > 1 and sys.argv[1] in ("help", "--help", "-h"):
+        print_help()
+        return
+    asyncio.run(main_async())
+
 if __name__ == "__main__":
     main()
@@ -32,7 +32,7 @@ setup(
     packages=find_packages(where="src"),
     python_requires=">=3.12",
     install_requires=[
-        "pandas>=2.0.0",
+        "pandas>=2.1.0",
         "numpy>=1.24.0",
         "prophet>=1.1.4",
         "darts>=0.24.0",
@@ -47,6 +47,7 @@ setup(
         "plotly>=5.18.0",
         "statsmodels>=0.14.1",
         "scikit-learn>=1.3.2",
+        "joblib>=1.3.0",
     ],
     entry_points={
         'console_scripts': [
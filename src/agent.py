@@ -1,10 +1,168 @@
 import os
+import re
+import sys
 import json
-import pandas as pd
+from collections import OrderedDict
 from .memory_manager import MemoryManager
-from .tools_manager import ToolsManager
 from .planner import Planner
+from .io_utils import fast_read_csv
 from .ollama_manager import get_available_models, initialize_llm
+from langchain_core.prompts import ChatPromptTemplate
+
+# Loaded datasets (pristine frame plus analysis) kept for re-analysis of unchanged files
+DATASET_CACHE_SIZE = 4
+
+# Static instruction prefixes. These are sent as the system message so the
+# Ollama prefix cache can reuse them; everything per-call goes in the human message.
+CODEGEN_SYSTEM_PROMPT = """You are a forecasting assistant. You receive the current data context,
+previous interactions and a user query.
+
+If you need to generate code, respond with:
+ACTION: CODE_GENERATION
+CODE:
+```python
+<your code here>
+```
+EXPLANATION: <explain what the code does>
+
+The code runs with only `pd`, `np` and the dataset `df` predefined; import anything else it uses.
+Variables the code defines are returned to the user, except very large ones. To return
+specific values (including large DataFrames), assign a dict of them to __agent_result__.
+
+For other actions, respond with:
+ACTION: <DATA_ANALYSIS|FORECAST|GENERAL>
+EXPLANATION: <why this action>
+TOOLS_NEEDED: <list of required tools>
+"""
+
+FIX_SYSTEM_PROMPT = """You fix Python code that failed to execute. You receive the error message,
+the failed code, the data context and a summary of previous attempts.
+
+Please:
+1. Analyze the error message and explain what's wrong
+2. Provide a detailed explanation of the fixes needed
+3. Provide the corrected code
+4. Add error handling for similar issues
+
+Respond in this format:
+
+ERROR ANALYSIS:
+<explain what caused the error>
+
+PROPOSED FIXES:
+<list the specific changes being made>
+
+CODE:
+```python
+<corrected code>
+```
+"""
+
+CODEGEN_HUMAN_TEMPLATE = """Current context:
+Data available: {data_info}
+Data structure:
+- CSV file: {csv_path}
+- Target column: {target_column}
+- Series ID column: {series_id_column}
+Previous analysis: {last_analysis}
+{history}
+User query: {query}
+"""
+
+FIX_HUMAN_TEMPLATE = """Error Message:
+{error}
+
+Failed Code:
+```python
+{code}
+```
+
+{data_context}
+
+Previous Attempts Summary:
+{attempts}
+{hint}"""
+
+# Appended to the fix prompt to get differently phrased candidates from one batch
+FIX_VARIANT_HINTS = (
+    "",
+    "Prefer the smallest change to the failed code that resolves the error.",
+    "If the failing approach is fragile, rewrite that part using a different method.",
+)
+
+FIX_INSTRUCTIONS_SYSTEM_PROMPT = """You improve Python code whose previous execution produced empty or
+incorrect results. You receive the previous code, its output, the data context and the
+user's instructions.
+
+Please provide fixed code that:
+1. Keeps the core functionality
+2. Follows the user's instructions
+3. Handles all edge cases
+
+Respond in this format:
+
+ERROR ANALYSIS:
+<explain what was wrong with the previous output>
+
+PROPOSED FIXES:
+<list the specific changes being made based on user instructions>
+
+CODE:
+```python
+<corrected code>
+```
+
+EXPLANATION:
+<explain how the fixes address the issue>
+"""
+
+FIX_INSTRUCTIONS_HUMAN_TEMPLATE = """User instructions: {instructions}
+
+Previous code:
+```python
+{code}
+```
+
+Previous results:
+{results}
+
+{data_context}
+"""
+
+# Section markers and ```python blocks of an LLM reply, matched in one pass.
+# Code blocks are consumed whole so markers inside code are not mistaken for sections.
+_SECTION_RE = re.compile(
+    r"```python\n(?P<code>.*?)```"
+    r"|^[ \t]*(?P<header>ACTION|ERROR ANALYSIS|PROPOSED FIXES|CODE|EXPLANATION|TOOLS_NEEDED):",
+    re.DOTALL | re.MULTILINE
+)
+
+def _parse_response(text):
+    """
+    Split an LLM reply into its marked sections.
+    
+    Args:
+        text (str): LLM response text
+        
+    Returns:
+        dict: Section text keyed by lower-case marker name ('action', 'error_analysis',
+            'proposed_fixes', 'explanation', 'tools_needed') plus 'code' for the
+            first ```python block
+    """
+    sections = {}
+    header, start = None, 0
+    for match in _SECTION_RE.finditer(text):
+        if match.group('code') is not None:
+            sections.setdefault('code', match.group('code').strip())
+            continue
+        if header:
+            sections.setdefault(header, text[start:match.start()].strip())
+        # CODE: only labels the block that follows
+        header = None if match.group('header') == 'CODE' else match.group('header').lower().replace(' ', '_')
+        start = match.end()
+    if header:
+        sections.setdefault(header, text[start:].strip())
+    return sections
 
 class ForecastingAgent:
     """
@@ -18,16 +176,16 @@ class ForecastingAgent:
         memory_manager (MemoryManager): Manages conversation and execution history
         _tools_manager (ToolsManager): Handles code execution and tool management
         planner (Planner): Manages execution planning
-        llm: LLM interface for natural language processing
+        llm: Chat model interface for natural language processing
         current_data (pd.DataFrame): Currently loaded dataset
         current_context (dict): Current execution context
         _last_code (str): Last executed code
         _last_error (str): Last error message
         _last_result (str): Last execution result
     """
-    def __init__(self):
-        self.memory_manager = MemoryManager()
-        self._tools_manager = ToolsManager()  # renamed to _tools_manager
+    def __init__(self, session_id=None):
+        self.memory_manager = MemoryManager(session_id)
+        self._tools_manager = None  # created on first use, see tools_manager
         self.planner = Planner()
         self.llm = None
         self.current_data = None
@@ -35,10 +193,25 @@ class ForecastingAgent:
         self._last_code = None
         self._last_error = None
         self._last_result = None
+        self._analysis_cache = OrderedDict()
+        self._codegen_prompt = ChatPromptTemplate.from_messages([
+            ("system", CODEGEN_SYSTEM_PROMPT), ("human", CODEGEN_HUMAN_TEMPLATE)
+        ])
+        self._fix_prompt = ChatPromptTemplate.from_messages([
+            ("system", FIX_SYSTEM_PROMPT), ("human", FIX_HUMAN_TEMPLATE)
+        ])
+        self._fix_instructions_prompt = ChatPromptTemplate.from_messages([
+            ("system", FIX_INSTRUCTIONS_SYSTEM_PROMPT), ("human", FIX_INSTRUCTIONS_HUMAN_TEMPLATE)
+        ])
         
     @property
     def tools_manager(self):
-        return self._tools_manager  # return the internal variable
+        # Imported lazily: tools_manager pulls in prophet and langchain_experimental,
+        # which would otherwise delay startup before the user has picked a model.
+        if self._tools_manager is None:
+            from .tools_manager import ToolsManager
+            self._tools_manager = ToolsManager()
+        return self._tools_manager
     
     def initialize(self):
         # Get available Ollama models
@@ -52,7 +225,12 @@ class ForecastingAgent:
         
     def process_dataset(self, csv_path, target_column, series_id_column):
         """
-        Load and analyze a dataset.
+        Load and analyze a dataset, making it the current data.
+        
+        The parsed frame and its analysis are cached by file path, modification
+        time and size, so re-analyzing an unchanged file skips parsing and
+        analysis. The cached frame is never handed out: executed code may modify
+        the current frame in place, so current_data is always a copy of it.
         
         Args:
             csv_path (str): Path to the CSV file
@@ -62,8 +240,24 @@ class ForecastingAgent:
         Returns:
             dict: Analysis results including statistics and insights
         """
-        # Read dataset
-        df = pd.read_csv(csv_path)
+        stat = os.stat(csv_path)
+        cache_key = (os.path.abspath(csv_path), stat.st_mtime, stat.st_size,
+                     target_column, series_id_column)
+        
+        cached = self._analysis_cache.get(cache_key)
+        if cached is None:
+            pristine = fast_read_csv(csv_path)
+            analysis = self.tools_manager.generate_descriptive_analysis(pristine, target_column, series_id_column)
+            self._analysis_cache[cache_key] = (pristine, analysis)
+            if len(self._analysis_cache) > DATASET_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        else:
+            pristine, analysis = cached
+            self._analysis_cache.move_to_end(cache_key)
+        
+        # A memory copy is far cheaper than re-parsing the CSV
+        df = pristine.copy()
+        self.current_data = df
         
         # Store basic information in memory
         self.memory_manager.store_dataset_info({
@@ -73,13 +267,11 @@ class ForecastingAgent:
             'columns': df.columns.tolist()
         })
         
-        # Generate descriptive analysis
-        analysis = self.tools_manager.generate_descriptive_analysis(df, target_column, series_id_column)
         self.memory_manager.store_analysis(analysis)
         
         return analysis
 
-    def process_query(self, query):
+    async def process_query(self, query, use_cache=True):
         """
         Process a natural language query from the user.
         
@@ -91,6 +283,8 @@ class ForecastingAgent:
         
         Args:
             query (str): User's natural language query
+            use_cache (bool): Whether a semantically cached reply may be reused;
+                False forces the LLM to generate a new one
             
         Returns:
             str: Response or execution results
@@ -103,102 +297,66 @@ class ForecastingAgent:
             if not fix_instructions:
                 return "Please provide instructions for the fix, e.g., 'fix write results to csv'"
                 
-            prompt = f"""Previous execution resulted in:
-
-            Code:
-            ```python
-            {self._last_code}
-            ```
-
-            Results:
-            {self._last_result}
-
-            User wants to: {fix_instructions}
-
-            Please provide fixed code that:
-            1. Keeps the core functionality
-            2. {fix_instructions}
-            3. Handles all edge cases
-            
-            Respond with:
-            
-            ERROR ANALYSIS:
-            <explain what needs to be fixed>
-            
-            PROPOSED FIXES:
-            <list specific changes>
-            
-            CODE:
-            ```python
-            <fixed code>
-            ```
-            
-            EXPLANATION:
-            <explain how the fixes work>
-            """
-            
-            response = self.llm.invoke(prompt)
-            return self._plan_and_execute(response, query)
+            response = await self._ask_llm(self._fix_instructions_prompt, {
+                'instructions': fix_instructions,
+                'code': self._last_code,
+                'results': self._last_result,
+                'data_context': self._data_context()
+            })
+            return await self._plan_and_execute(response, query)
             
         if not self.llm:
             return "Error: LLM not initialized"
             
         try:
-            context = self.memory_manager.get_relevant_context()
+            data_info = self.current_context.get('data_info', 'No data loaded')
+            cache_context = self._cache_context()
+            semantic_cache = self.memory_manager.semantic_cache
+            query_embedding = semantic_cache.encode(query)
+            cached_response = semantic_cache.lookup(query_embedding, cache_context) if use_cache else None
+            if cached_response is not None:
+                self.memory_manager.store_interaction(query, cached_response, embedding=query_embedding)
+                return await self._plan_and_execute(cached_response, query)
+            
+            context = self.memory_manager.get_relevant_context(query_embedding)
             
             # Format conversation history
             history_text = ""
             if context.get('conversation_history'):
                 history_text = "\nPrevious interactions:\n"
-                for interaction in context['conversation_history'][-5:]:  # Last 5 interactions
+                for interaction in context['conversation_history']:
                     history_text += f"\nUser: {interaction['query']}\n"
-                    history_text += f"Assistant: {interaction['response']}\n"
                     if interaction.get('error'):
                         history_text += f"Error: {interaction['error']}\n"
-                    if interaction.get('fixes'):
-                        history_text += f"Fixes: {interaction['fixes']}\n"
             
-            prompt = f"""You are a forecasting assistant. Current context:
-            Data available: {self.current_context.get('data_info', 'No data loaded')}
-            Data structure:
-            - CSV file: {self.current_context.get('csv_path')}
-            - Target column: {self.current_context.get('target_column')}
-            - Series ID column: {self.current_context.get('series_id_column')}
-            Previous analysis: {context.get('last_analysis', 'None')}
-            
-            {history_text}
-            
-            User query: {query}
-            
-            If you need to generate code, respond with:
-            ACTION: CODE_GENERATION
-            CODE:
-            ```python
-            <your code here>
-            ```
-            EXPLANATION: <explain what the code does>
-            
-            For other actions, respond with:
-            ACTION: <DATA_ANALYSIS|FORECAST|GENERAL>
-            EXPLANATION: <why this action>
-            TOOLS_NEEDED: <list of required tools>
-            """
-            
-            response = self.llm.invoke(prompt)
+            response = await self._ask_llm(self._codegen_prompt, {
+                'data_info': data_info,
+                'csv_path': self.current_context.get('csv_path'),
+                'target_column': self.current_context.get('target_column'),
+                'series_id_column': self.current_context.get('series_id_column'),
+                'last_analysis': context.get('last_analysis', 'None'),
+                'history': history_text,
+                'query': query
+            })
             # Store the interaction
-            self.memory_manager.store_interaction(query, str(response))
-            return self._plan_and_execute(response, query)
+            self.memory_manager.store_interaction(query, response, embedding=query_embedding)
+            # Cached only once its code has run successfully, see _plan_and_execute
+            return await self._plan_and_execute(response, query,
+                                                cache_entry=(query_embedding, cache_context, response))
             
         except Exception as e:
             return f"Error processing query: {str(e)}"
 
-    def _plan_and_execute(self, llm_response, original_query):
+    async def _plan_and_execute(self, llm_response, original_query, cache_entry=None):
         """
         Plan and execute actions based on LLM response.
         
         Args:
             llm_response (str): Response from the LLM
             original_query (str): Original user query
+            cache_entry (tuple, optional): (embedding, context, response) to add to
+                the semantic cache if the response's code executes successfully on
+                the first attempt
             
         Returns:
             str: Execution results or error message
@@ -211,73 +369,16 @@ class ForecastingAgent:
         try:
             response_text = str(llm_response)
             action = None
-            code = None
-            explanation = None
             
-            # Handle fix command with instructions
-            if original_query.lower().startswith('fix'):
-                if not hasattr(self, '_last_code') or not hasattr(self, '_last_error'):
-                    return "No previous code execution found to fix"
-                    
-                fix_instructions = original_query[3:].strip()  # Remove 'fix' and get instructions
-                fix_prompt = f"""The previous code execution produced empty or incorrect results.
-                User instructions: {fix_instructions}
-
-                Previous Code:
-                ```python
-                {self._last_code}
-                ```
-
-                Last Error/Output:
-                {self._last_error}
-
-                Data Context:
-                - DataFrame 'df' contains {len(self.current_data)} rows
-                - Columns: {', '.join(self.current_data.columns)}
-                - Target column: '{self.current_context.get('target_column')}'
-                - Series ID column: '{self.current_context.get('series_id_column')}'
-                - Date column format: {self.current_data['date'].dtype}
-
-                Please fix the code according to the user's instructions.
-                
-                Respond in this format:
-                
-                ERROR ANALYSIS:
-                <explain what was wrong with the previous output>
-                
-                PROPOSED FIXES:
-                <list the specific changes being made based on user instructions>
-                
-                CODE:
-                ```python
-                <corrected code>
-                ```
-                
-                EXPLANATION:
-                <explain how the fixes address the issue>
-                """
-                
-                fix_response = self.llm.invoke(fix_prompt)
-                return self._plan_and_execute(fix_response, original_query)
-
             # Parse the response
-            if "ACTION: CODE_GENERATION" in response_text:
+            sections = _parse_response(response_text)
+            code = sections.get('code')
+            explanation = sections.get('explanation')
+            if sections.get('action'):
+                action = sections['action'].partition('\n')[0].strip().upper()
+            # Replies to fix prompts carry code without an ACTION marker
+            if original_query.lower().startswith('fix'):
                 action = "CODE_GENERATION"
-                # Extract code between ```python and ``` markers
-                start = response_text.find("```python\n") + 10
-                end = response_text.find("```", start)
-                if start > 9 and end > start:
-                    code = response_text[start:end].strip()
-                    
-                # Extract explanation
-                if "EXPLANATION:" in response_text:
-                    explanation = response_text.split("EXPLANATION:", 1)[1].strip()
-            else:
-                for line in response_text.split('\n'):
-                    if line.startswith('ACTION:'):
-                        action = line.split(':', 1)[1].strip().upper()
-                    elif line.startswith('EXPLANATION:'):
-                        explanation = line.split(':', 1)[1].strip()
             
             if not action:
                 return "Couldn't determine appropriate action"
@@ -295,7 +396,8 @@ class ForecastingAgent:
                     print("```python")
                     print(code)
                     print("```")
-                    print("\nCode Explanation:", explanation)
+                    if explanation:  # fix candidates carry no explanation
+                        print("\nCode Explanation:", explanation)
                     
                     user_input = input("\nWould you like to execute this code? (yes/no/quit): ").lower()
                     if user_input == 'quit':
@@ -303,6 +405,8 @@ class ForecastingAgent:
                     if user_input != 'yes':
                         continue  # Ask for execution again
                     
+                    # Run on the main thread so Ctrl-C can interrupt a runaway snippet
+                    # and plotting backends that require the main thread keep working
                     result = self.tools_manager.execute_code(code, df=self.current_data)
                     
                     # Store last code and result for potential fixes
@@ -311,6 +415,8 @@ class ForecastingAgent:
                     self._last_result = self.tools_manager.format_code_output(result)
                     
                     if result['success']:
+                        if cache_entry and attempt == 1:
+                            self.memory_manager.semantic_cache.add(*cache_entry)
                         return self._last_result
                     
                     # Store attempt history
@@ -328,71 +434,35 @@ class ForecastingAgent:
                     print(result['output'])
                     print("\nAsking LLM to fix the code...")
                     
-                    fix_prompt = f"""The code execution failed. Here's the context:
-
-                    Error Message:
-                    {result['output']}
-                    
-                    Failed Code:
-                    ```python
-                    {code}
-                    ```
-                    
-                    Data Context:
-                    - DataFrame 'df' contains {len(self.current_data)} rows
-                    - Columns: {', '.join(self.current_data.columns)}
-                    - Target column: '{self.current_context.get('target_column')}'
-                    - Series ID column: '{self.current_context.get('series_id_column')}'
-                    - Date column format: {self.current_data['date'].dtype}
-                    
-                    Previous Attempts Summary:
-                    {json.dumps([{'attempt': a['attempt'], 'error': a['error']} 
-                              for a in attempt_history], indent=2)}
-                    
-                    Please:
-                    1. Analyze the error message and explain what's wrong
-                    2. Provide a detailed explanation of the fixes needed
-                    3. Provide the corrected code
-                    4. Add error handling for similar issues
-                    
-                    Respond in this format:
-                    
-                    ERROR ANALYSIS:
-                    <explain what caused the error>
-                    
-                    PROPOSED FIXES:
-                    <list the specific changes being made>
-                    
-                    CODE:
-                    ```python
-                    <corrected code>
-                    ```
-                    
-                    EXPLANATION:
-                    <explain how the fixes address the error>
-                    """
+                    fix_variables = {
+                        'error': result['output'],
+                        'code': code,
+                        'data_context': self._data_context(),
+                        # Only the most recent attempts, errors truncated, to bound prompt size
+                        'attempts': json.dumps([{'attempt': a['attempt'], 'error': a['error'][:500]} 
+                                                for a in attempt_history[-2:]], indent=2)
+                    }
                     
-                    fix_response = self.llm.invoke(fix_prompt)
+                    # Request several candidates concurrently and keep the first usable one.
+                    # Generation stops at any explanation the model adds after the code.
+                    fix_responses = await self._ask_llm_batch(
+                        self._fix_prompt,
+                        [{**fix_variables, 'hint': hint} for hint in FIX_VARIANT_HINTS],
+                        stop=["EXPLANATION:"]
+                    )
+                    fix_response, fix_sections = self._pick_fix_candidate(fix_responses)
                     try:
-                        new_code = str(fix_response)
-                        # Extract error analysis
-                        if "ERROR ANALYSIS:" in new_code:
+                        if 'error_analysis' in fix_sections:
                             print("\nError Analysis:")
-                            print(new_code.split("ERROR ANALYSIS:", 1)[1].split("PROPOSED FIXES:", 1)[0].strip())
+                            print(fix_sections['error_analysis'])
                         
-                        # Extract proposed fixes
-                        if "PROPOSED FIXES:" in new_code:
+                        if 'proposed_fixes' in fix_sections:
                             print("\nProposed Fixes:")
-                            print(new_code.split("PROPOSED FIXES:", 1)[1].split("CODE:", 1)[0].strip())
+                            print(fix_sections['proposed_fixes'])
                         
-                        # Extract code
-                        start = new_code.find("```python\n")
-                        end = new_code.find("```", start + 10)
-                        if start >= 0 and end > start + 10:
-                            code = new_code[start + 10:end].strip()
-                            # Extract explanation if available
-                            if "EXPLANATION:" in new_code[end:]:
-                                explanation = new_code[end:].split("EXPLANATION:", 1)[1].strip()
+                        if fix_sections.get('code'):
+                            code = fix_sections['code']
+                            explanation = fix_sections.get('explanation')
                             continue
                         else:
                             print("Error: Could not find code in LLM response")
@@ -403,7 +473,7 @@ class ForecastingAgent:
                             choice = input("Enter choice (1/2/3): ")
                             if choice == '2':
                                 # Generate completely new code
-                                return self.process_query(original_query)
+                                return await self.process_query(original_query, use_cache=False)
                             elif choice == '3':
                                 return "Code execution cancelled by user"
                             # Otherwise continue with same code
@@ -416,7 +486,7 @@ class ForecastingAgent:
                     # Store the error and fixes in memory
                     self.memory_manager.store_interaction(
                         original_query,
-                        str(fix_response),
+                        fix_response,
                         code=code,
                         error=result['output'],
                         fixes=attempt_history
@@ -446,18 +516,114 @@ class ForecastingAgent:
                 user_input = input("\nDo you want to execute this code? (yes/no): ")
                 
                 if user_input.lower() == 'yes':
-                    result = self.tools_manager.execute_code(
-                        explanation,
-                        df=self.current_data
-                    )
+                    result = self.tools_manager.execute_code(explanation, df=self.current_data)
                     return self.tools_manager.format_code_output(result)
                 else:
                     return "Code execution cancelled."
             else:
-                return self.llm.invoke(original_query)
+                return (await self.llm.ainvoke(original_query)).content
                 
         except Exception as e:
             return f"Error executing action: {str(e)}"
 
+    async def _ask_llm(self, prompt, variables):
+        """
+        Send a chat prompt to the LLM.
+        
+        The response is streamed and echoed to stdout as tokens arrive.
+        
+        Args:
+            prompt (ChatPromptTemplate): Static system message plus human message template
+            variables (dict): Values for the human message placeholders
+            
+        Returns:
+            str: Response text
+        """
+        response_text = ""
+        async for chunk in (prompt | self.llm).astream(variables):
+            response_text += chunk.content
+            sys.stdout.write(chunk.content)
+            sys.stdout.flush()
+        print()
+        return response_text
+
+    async def _ask_llm_batch(self, prompt, variables_list, stop=None):
+        """
+        Send several fillings of one chat prompt to the LLM concurrently.
+        
+        Args:
+            prompt (ChatPromptTemplate): Static system message plus human message template
+            variables_list (list): Placeholder values, one dict per request
+            stop (list, optional): Stop sequences for generation
+            
+        Returns:
+            list: Texts of the requests that succeeded, in request order
+            
+        Raises:
+            Exception: The first request's error if every request failed
+        """
+        responses = await (prompt | self.llm.bind(stop=stop)).abatch(
+            variables_list,
+            config={"max_concurrency": len(variables_list)},
+            return_exceptions=True
+        )
+        errors = [r for r in responses if isinstance(r, Exception)]
+        if errors and len(errors) == len(responses):
+            raise errors[0]
+        for e in errors:
+            print(f"Warning: LLM request failed: {e}")
+        return [r.content for r in responses if not isinstance(r, Exception)]
+
+    @staticmethod
+    def _pick_fix_candidate(responses):
+        """
+        Choose the first fix response whose code block compiles.
+        
+        Args:
+            responses (list): Candidate LLM responses
+            
+        Returns:
+            tuple: (response, parsed sections) of the selected candidate; the first
+                candidate if none compiles, or ("", {}) if there are none
+        """
+        candidates = [(response, _parse_response(response)) for response in responses]
+        for response, sections in candidates:
+            if not sections.get('code'):
+                continue
+            try:
+                compile(sections['code'], '<fix>', 'exec')
+            except SyntaxError:
+                continue
+            return response, sections
+        return candidates[0] if candidates else ("", {})
+
+    def _cache_context(self):
+        """
+        Identify the loaded dataset for the semantic cache.
+        
+        Uses the file path and the full column list rather than the shortened
+        data_info summary, so different files never share cached replies.
+        """
+        if self.current_data is None:
+            return 'No data loaded'
+        ctx = self.current_context
+        return "|".join([
+            os.path.abspath(ctx.get('csv_path') or ''),
+            str(ctx.get('target_column')),
+            str(ctx.get('series_id_column')),
+            str(len(self.current_data)),
+            ', '.join(map(str, self.current_data.columns))
+        ])
+
+    def _data_context(self):
+        """Describe the loaded DataFrame for fix prompts."""
+        # Read live: executed code may have changed the frame in place
+        return f"""Data Context:
+- DataFrame 'df' contains {len(self.current_data)} rows
+- Columns: {', '.join(map(str, self.current_data.columns))}
+- Target column: '{self.current_context.get('target_column')}'
+- Series ID column: '{self.current_context.get('series_id_column')}'
+- Date column format: {self.current_data['date'].dtype}"""
+
     def save_session(self):
         self.memory_manager.save_to_disk()
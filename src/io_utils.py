@@ -0,0 +1,41 @@
+import pandas as pd
+
+
+def _read_csv_pyarrow(path):
+    """
+    Read a CSV file with pyarrow, keeping date and time columns as text.
+    
+    pyarrow infers dates and timestamps while the pandas C parser leaves them
+    as strings. The schema is sniffed from the first block and temporal
+    columns are pinned to strings, so both readers return the same frame.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    
+    with pa_csv.open_csv(path) as reader:
+        schema = reader.schema
+    column_types = {field.name: pa.string() for field in schema if pa.types.is_temporal(field.type)}
+    table = pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(
+        column_types=column_types, strings_can_be_null=True
+    ))
+    return table.to_pandas()
+
+
+def fast_read_csv(path):
+    """
+    Read a CSV file, preferring the multithreaded pyarrow parser.
+    
+    Falls back to the default pandas C parser when pyarrow is not installed
+    or cannot handle the file. Either way, date-like columns are returned as
+    strings, as the C parser does.
+    
+    Args:
+        path (str): Path to the CSV file
+        
+    Returns:
+        pd.DataFrame: Loaded dataset
+    """
+    try:
+        return _read_csv_pyarrow(path)
+    except (ImportError, ValueError):
+        return pd.read_csv(path)
@@ -1,6 +1,17 @@
 import json
 import os
+from collections import deque
 from datetime import datetime
+from itertools import islice
+import numpy as np
+from .semantic_cache import SemanticCache
+
+# Interactions kept in memory; older ones remain only in history.jsonl
+MAX_HISTORY = int(os.environ.get('FC_AGENT_MEMORY_SIZE', 50))
+# Interactions handed to the LLM as conversation context
+CONTEXT_WINDOW = 5
+# Interaction fields included in LLM context
+CONTEXT_FIELDS = frozenset({'query', 'error'})
 
 class MemoryManager:
     """
@@ -16,16 +27,60 @@ class MemoryManager:
         session_id (str): Unique identifier for current session
         short_term_memory (list): Recent interactions and context
         long_term_memory (list): Persistent storage of important information
-        conversation_history (list): Complete interaction history
+        conversation_history (deque): Most recent MAX_HISTORY interactions
         last_execution (dict): Most recent execution details
+        semantic_cache (SemanticCache): Embedding-similarity cache of LLM responses
     """
 
-    def __init__(self):
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def __init__(self, session_id=None):
+        self.session_id = session_id or datetime.now().strftime("%Y%m%d_%H%M%S")
         self.short_term_memory = []
         self.long_term_memory = []
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=MAX_HISTORY)
         self.last_execution = None
+        self.semantic_cache = SemanticCache()
+        self._history_file = None
+        # Query embeddings, row-aligned with conversation_history (None if unavailable)
+        self._history_embeddings = None
+        
+        if session_id:
+            self._load_session()
+        
+    @property
+    def session_dir(self):
+        return os.path.join('sessions', self.session_id)
+    
+    def _load_session(self):
+        """Rehydrate memory, history and semantic cache of a previous session."""
+        memory_path = os.path.join(self.session_dir, 'memory.json')
+        if os.path.exists(memory_path):
+            with open(memory_path) as f:
+                memory = json.load(f)
+            self.short_term_memory = memory.get('short_term', [])
+            self.long_term_memory = memory.get('long_term', [])
+        
+        history_path = os.path.join(self.session_dir, 'history.jsonl')
+        if os.path.exists(history_path):
+            with open(history_path) as f:
+                for line in f:
+                    if line.strip():
+                        self.conversation_history.append(json.loads(line))
+            if self.conversation_history:
+                self.last_execution = self.conversation_history[-1]
+                # One batched encode instead of one call per stored query
+                self._history_embeddings = self.semantic_cache.encode(
+                    [interaction['query'] for interaction in self.conversation_history]
+                )
+        
+        self.semantic_cache.load(self.session_dir)
+    
+    def _append_history(self, interaction):
+        """Append one interaction to the session's history.jsonl."""
+        if self._history_file is None:
+            os.makedirs(self.session_dir, exist_ok=True)
+            self._history_file = open(os.path.join(self.session_dir, 'history.jsonl'), 'a')
+        self._history_file.write(json.dumps(interaction, default=str) + "\n")
+        self._history_file.flush()
         
     def store_dataset_info(self, info):
         """
@@ -54,16 +109,25 @@ class MemoryManager:
         })
         
     def save_to_disk(self):
-        memory_dir = os.path.join('sessions', self.session_id)
+        """
+        Write short/long-term memory and the semantic cache to the session directory.
+        
+        Conversation history is not rewritten here; it is appended to
+        history.jsonl as each interaction is stored.
+        """
+        memory_dir = self.session_dir
         os.makedirs(memory_dir, exist_ok=True)
         
         with open(os.path.join(memory_dir, 'memory.json'), 'w') as f:
             json.dump({
                 'short_term': self.short_term_memory,
                 'long_term': self.long_term_memory
-            }, f)
+            }, f, default=str)
+        
+        self.semantic_cache.save(memory_dir)
     
-    def store_interaction(self, query, response, code=None, error=None, fixes=None, result=None):
+    def store_interaction(self, query, response, code=None, error=None, fixes=None, result=None,
+                          embedding=None):
         """
         Store a complete interaction including query, response, and execution details.
         
@@ -74,7 +138,17 @@ class MemoryManager:
             error (str, optional): Error message if any
             fixes (list, optional): Applied fixes
             result (str, optional): Execution results
+            embedding (np.ndarray, optional): Precomputed query embedding
         """
+        if embedding is None:
+            embedding = self.semantic_cache.encode(query)
+        if embedding is None:
+            self._history_embeddings = None
+        elif self._history_embeddings is None:
+            self._history_embeddings = embedding.reshape(1, -1)
+        else:
+            self._history_embeddings = np.vstack([self._history_embeddings, embedding])[-MAX_HISTORY:]
+        
         interaction = {
             'timestamp': datetime.now().isoformat(),
             'query': query,
@@ -85,6 +159,7 @@ class MemoryManager:
             'result': result
         }
         self.conversation_history.append(interaction)
+        self._append_history(interaction)
         self.last_execution = interaction
         self.short_term_memory.append({
             'type': 'interaction',
@@ -92,10 +167,16 @@ class MemoryManager:
             'timestamp': datetime.now().isoformat()
         })
     
-    def get_relevant_context(self):
+    def get_relevant_context(self, query_embedding=None):
         """
         Retrieve relevant context for current interaction.
         
+        With a query embedding, the interactions most similar to the query are
+        returned (in chronological order); otherwise the most recent ones.
+        
+        Args:
+            query_embedding (np.ndarray, optional): Embedding of the current query
+            
         Returns:
             dict: Context including recent analysis and conversation history
         """
@@ -107,7 +188,19 @@ class MemoryManager:
                 context['last_analysis'] = item['content']
                 break
         
-        # Get conversation history
-        context['conversation_history'] = self.conversation_history
+        # Get a few interactions, without bulky response/code text
+        history = self.conversation_history
+        embeddings = self._history_embeddings
+        if (query_embedding is not None and embeddings is not None
+                and len(embeddings) == len(history)):
+            scores = embeddings @ query_embedding
+            top = sorted(np.argsort(scores)[-CONTEXT_WINDOW:])
+            selected = [history[i] for i in top]
+        else:
+            selected = islice(history, max(0, len(history) - CONTEXT_WINDOW), None)
+        context['conversation_history'] = [
+            {k: v for k, v in interaction.items() if k in CONTEXT_FIELDS}
+            for interaction in selected
+        ]
         
         return context
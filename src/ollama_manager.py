@@ -1,15 +1,49 @@
+import functools
+import json
+import os
+import random
 import requests
-from langchain_ollama import OllamaLLM
+from requests.adapters import HTTPAdapter
+from langchain_ollama import ChatOllama
 import time
 from requests.exceptions import RequestException
 
+OLLAMA_BASE_URL = "http://localhost:11434"
+MODELS_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "forecasting-agent", "models.json")
+MODELS_CACHE_TTL = 300  # seconds
+
+# Shared session so repeated requests to Ollama reuse the TCP connection
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+def _read_models_cache():
+    """Return the cached model list if it is younger than MODELS_CACHE_TTL."""
+    try:
+        if time.time() - os.path.getmtime(MODELS_CACHE_PATH) < MODELS_CACHE_TTL:
+            with open(MODELS_CACHE_PATH) as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _write_models_cache(models):
+    try:
+        os.makedirs(os.path.dirname(MODELS_CACHE_PATH), exist_ok=True)
+        with open(MODELS_CACHE_PATH, 'w') as f:
+            json.dump(models, f)
+    except OSError:
+        pass
+
+@functools.lru_cache(maxsize=1)
 def get_available_models(max_retries=3, retry_delay=1):
     """
     Retrieve list of available models from Ollama service.
     
+    Results are cached in-process and on disk for MODELS_CACHE_TTL seconds.
+    
     Args:
         max_retries (int): Maximum connection attempts
-        retry_delay (int): Delay between retries in seconds
+        retry_delay (int): Base delay between retries in seconds, doubled per attempt
         
     Returns:
         list: Available model names
@@ -17,17 +51,23 @@ def get_available_models(max_retries=3, retry_delay=1):
     Raises:
         RequestException: If cannot connect to Ollama service
     """
+    cached = _read_models_cache()
+    if cached is not None:
+        return cached
+    
     for attempt in range(max_retries):
         try:
-            response = requests.get('http://localhost:11434/api/tags', timeout=5)
+            response = _SESSION.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=5)
             response.raise_for_status()
-            return [model['name'] for model in response.json()['models']]
+            models = [model['name'] for model in response.json()['models']]
+            _write_models_cache(models)
+            return models
         except RequestException as e:
             if attempt == max_retries - 1:
                 print(f"Warning: Could not connect to Ollama service: {e}")
                 return ['llama2', 'codellama']  # fallback defaults
             print(f"Retry {attempt + 1}/{max_retries} connecting to Ollama...")
-            time.sleep(retry_delay)
+            time.sleep(retry_delay * (2 ** attempt) + random.uniform(0, 0.1))
 
 def initialize_llm(model_name):
     """
@@ -37,20 +77,20 @@ def initialize_llm(model_name):
         model_name (str): Name of the model to initialize
         
     Returns:
-        OllamaLLM: Initialized LLM interface
+        ChatOllama: Initialized chat model interface
         
     Raises:
         Exception: If initialization fails
     """
     try:
-        llm = OllamaLLM(
+        llm = ChatOllama(
             model=model_name,
             temperature=0.7,
             request_timeout=30.0,  # Increase timeout
-            base_url="http://localhost:11434",  # Explicitly set base URL
+            base_url=OLLAMA_BASE_URL,  # Explicitly set base URL
         )
-        # Test the connection
-        llm.invoke("test")
+        # Test the connection without paying for a generation
+        _SESSION.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=2).raise_for_status()
         return llm
     except Exception as e:
         print(f"Error initializing Ollama LLM: {e}")
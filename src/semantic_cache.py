@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+def fingerprint(text):
+    """Return a stable 64-bit fingerprint for a context string."""
+    digest = hashlib.blake2b(str(text).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for LLM responses.
+    
+    Queries are embedded with a small local sentence-transformer and compared
+    against previously answered queries for the same data context. A cached
+    response is returned when the cosine similarity exceeds the threshold.
+    
+    The embedding model is loaded lazily on first use; if sentence-transformers
+    is not installed the cache stays disabled.
+    
+    Attributes:
+        model_name (str): Sentence-transformer model used for embeddings
+        threshold (float): Minimum cosine similarity for a cache hit
+        responses (list): Cached responses, row-aligned with the embedding matrix
+    """
+    
+    def __init__(self, model_name='all-MiniLM-L6-v2', threshold=0.92):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.responses = []
+        self._model = None
+        self._disabled = False
+        self._matrix = None  # (n, dim) float32, rows are L2-normalized
+        self._fingerprints = np.empty(0, dtype=np.int64)
+    
+    def _load_model(self):
+        if self._model is None and not self._disabled:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+            except Exception as e:
+                print(f"Warning: Semantic cache disabled: {e}")
+                self._disabled = True
+        return self._model
+    
+    def encode(self, text):
+        """
+        Embed a query string, or a list of strings in one batch.
+        
+        Args:
+            text (str | list): Text to embed
+        
+        Returns:
+            np.ndarray: L2-normalized float32 embedding (one row per text for a
+                list), or None if unavailable
+        """
+        model = self._load_model()
+        if model is None:
+            return None
+        return model.encode(text, normalize_embeddings=True).astype(np.float32)
+    
+    def lookup(self, embedding, context):
+        """
+        Find a cached response for a semantically similar query.
+        
+        Args:
+            embedding (np.ndarray): Query embedding from encode()
+            context (str): Data context the response must have been produced for
+        
+        Returns:
+            str: Cached response, or None on a miss
+        """
+        if embedding is None or self._matrix is None:
+            return None
+        
+        scores = self._matrix @ embedding
+        scores[self._fingerprints != fingerprint(context)] = -1.0
+        best = int(np.argmax(scores))
+        if scores[best] > self.threshold:
+            return self.responses[best]
+        return None
+    
+    def add(self, embedding, context, response):
+        """
+        Store a response for later lookups.
+        
+        Args:
+            embedding (np.ndarray): Query embedding from encode()
+            context (str): Data context the response was produced for
+            response (str): LLM response text
+        """
+        if embedding is None:
+            return
+        row = embedding.reshape(1, -1)
+        self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+        self._fingerprints = np.append(self._fingerprints, fingerprint(context))
+        self.responses.append(response)
+    
+    def save(self, directory):
+        """
+        Write the cache to semantic_cache.npz and semantic_cache.json.
+        
+        Args:
+            directory (str): Session directory to write into
+        """
+        if self._matrix is None:
+            return
+        np.savez(os.path.join(directory, 'semantic_cache.npz'),
+                 matrix=self._matrix, fingerprints=self._fingerprints)
+        with open(os.path.join(directory, 'semantic_cache.json'), 'w') as f:
+            json.dump(self.responses, f)
+    
+    def load(self, directory):
+        """
+        Restore a cache written by save(); does nothing if the files are missing.
+        
+        Args:
+            directory (str): Session directory to read from
+        """
+        matrix_path = os.path.join(directory, 'semantic_cache.npz')
+        responses_path = os.path.join(directory, 'semantic_cache.json')
+        if not (os.path.exists(matrix_path) and os.path.exists(responses_path)):
+            return
+        with np.load(matrix_path) as data:
+            self._matrix = data['matrix']
+            self._fingerprints = data['fingerprints']
+        with open(responses_path) as f:
+            self.responses = json.load(f)
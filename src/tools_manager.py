@@ -1,20 +1,53 @@
 import pandas as pd
 import numpy as np
-from prophet import Prophet
+from joblib import Parallel, delayed
 from langchain_experimental.tools import PythonREPLTool
-from tabulate import tabulate
 import json
+import hashlib
+import importlib.util
 import io
 import ast
+import re
 from contextlib import redirect_stdout
 import subprocess
 import sys
 import warnings
 import traceback
+from collections import OrderedDict
+from functools import lru_cache
 
 # Silence the plotly import warning
 warnings.filterwarnings('ignore', 'Importing plotly failed')
 
+# Display format for descriptive statistics
+_FLOAT_FMT = "{:,.2f}".format
+# Per-series target statistics, in describe() order and labels
+_DESCRIBE_STATS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+# Fitted Prophet models kept for reuse across generate_forecast calls
+PROPHET_CACHE_SIZE = 32
+
+# Compiled code objects kept for snippets that are executed again
+CODE_CACHE_SIZE = 64
+
+# Standard library modules never need installing
+_STDLIB = frozenset(sys.stdlib_module_names)
+
+# Names execute_code puts in the snippet namespace itself
+_RESERVED = frozenset({'df', 'pd', 'np'})
+# Variables larger than this (bytes) are not returned unless put in __agent_result__
+MAX_RESULT_BYTES = 1_000_000
+
+# Imported on first forecast; prophet pulls in cmdstanpy and is slow to import
+_prophet_cls = None
+
+def _lazy_prophet():
+    global _prophet_cls
+    if _prophet_cls is None:
+        from prophet import Prophet
+        _prophet_cls = Prophet
+    return _prophet_cls
+
 def install_package(package):
     try:
         subprocess.check_call([sys.executable, "-m", "pip", "install", package])
@@ -23,6 +56,123 @@ def install_package(package):
         print(f"Error installing {package}: {e}")
         return False
 
+# Every import statement contains this word; snippets without it need no parse
+_IMPORT_RE = re.compile(r'\bimport\b')
+
+@lru_cache(maxsize=256)
+def _extract_imports_cached(code_snippet):
+    """
+    Top-level module names imported by a code snippet.
+    
+    The regex only pre-filters snippets that cannot contain imports; names come
+    from the AST so words in strings and comments are never mistaken for modules.
+    Cached because the agent re-submits the same snippets during fix loops.
+    
+    Returns:
+        tuple: Unique module names (a tuple so cached results stay immutable)
+    """
+    if not _IMPORT_RE.search(code_snippet):
+        return ()
+    try:
+        tree = ast.parse(code_snippet)
+    except SyntaxError:
+        # execute_code reports the syntax error when it compiles the snippet
+        return ()
+    
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module.split('.')[0])
+    return tuple(modules)
+
+def _result_size(value):
+    """Shallow size of a returned variable; pandas objects skip the deep object scan."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=False)))
+    return sys.getsizeof(value)
+
+def _series_keys(df, series_id_column):
+    """
+    Series id column as a categorical, so grouping works on integer codes.
+    
+    The caller's DataFrame is left unchanged; generated code keeps seeing the original dtype.
+    """
+    keys = df[series_id_column]
+    if not isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.astype('category')
+    return keys
+
+def _series_fingerprint(series, fit_df):
+    """Content hash of one series' Prophet input, used as the model cache key."""
+    digest = hashlib.blake2b(str(series).encode('utf-8'), digest_size=16)
+    digest.update(fit_df['ds'].to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(fit_df['y'].to_numpy(dtype=np.float64).tobytes())
+    return digest.digest()
+
+def _infer_freq(fit_df):
+    """Sampling frequency of a series, falling back to hourly when it cannot be inferred."""
+    try:
+        return pd.infer_freq(pd.DatetimeIndex(fit_df['ds']).sort_values()) or 'H'
+    except (TypeError, ValueError):  # fewer than 3 timestamps
+        return 'H'
+
+def _seasonality_flags(fit_df):
+    """
+    Enable only the seasonalities the series is long and fine-grained enough to estimate.
+    
+    Args:
+        fit_df (pd.DataFrame): Rows of one series as Prophet 'ds'/'y' columns
+        
+    Returns:
+        dict: Prophet yearly/weekly/daily_seasonality keyword arguments
+    """
+    ds = fit_df['ds'].sort_values()
+    span = ds.iloc[-1] - ds.iloc[0]
+    return {
+        'yearly_seasonality': bool(span >= pd.Timedelta(days=730)),
+        'weekly_seasonality': bool(span >= pd.Timedelta(days=14)),
+        'daily_seasonality': bool(ds.diff().median() < pd.Timedelta(hours=12))
+    }
+
+def _forecast_from_model(model, periods, freq):
+    """Predict the next periods with a fitted Prophet model."""
+    future = model.make_future_dataframe(periods=periods, freq=freq)
+    forecast = model.predict(future).tail(periods)
+    
+    # Kept as numpy arrays; formatting happens once in format_forecast_output
+    return {
+        'forecast': forecast['yhat'].to_numpy(),
+        'timestamps': forecast['ds'].to_numpy()
+    }
+
+def _fit_one_series(series, fit_df, periods, freq):
+    """
+    Fit Prophet on a single series and forecast it.
+    
+    Module-level so joblib can run it in worker processes.
+    
+    Args:
+        series: Series identifier
+        fit_df (pd.DataFrame): Rows of this series as Prophet 'ds'/'y' columns
+        periods (int): Number of periods to forecast
+        freq (str): Pandas frequency of the forecast timestamps
+        
+    Returns:
+        tuple: (series, fitted model or None, forecast dict or error message)
+    """
+    try:
+        model = _lazy_prophet()(**_seasonality_flags(fit_df))
+        model.fit(fit_df)
+        forecast = _forecast_from_model(model, periods, freq)
+        # The Stan backend is only used for fitting; dropping it keeps the
+        # model cheap to send back to the parent process.
+        model.stan_backend = None
+        return series, model, forecast
+    except Exception as e:
+        return series, None, f"Error forecasting: {str(e)}"
+
 class ToolsManager:
     """
     Manages code execution, dependencies, and analysis tools.
@@ -35,6 +185,9 @@ class ToolsManager:
     
     Attributes:
         code_interpreter: Python REPL tool for code execution
+        _dep_cache (dict): Module name -> availability, checked once per session
+        _prophet_cache (OrderedDict): LRU of fitted Prophet models by series fingerprint
+        _code_cache (OrderedDict): LRU of compiled code objects by snippet hash
     """
 
     def __init__(self):
@@ -43,35 +196,35 @@ class ToolsManager:
         except Exception as e:
             print(f"Warning: Code interpreter initialization failed: {e}")
             self.code_interpreter = None
+        self._dep_cache = {}
+        self._prophet_cache = OrderedDict()
+        self._code_cache = OrderedDict()
 
     def extract_imports_from_code(self, code_snippet):
-        """Extract import statements and module names from code using AST"""
-        try:
-            tree = ast.parse(code_snippet)
-            imports = []
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        imports.append(name.name.split('.')[0])
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imports.append(node.module.split('.')[0])
-            
-            return list(set(imports))  # Remove duplicates
-        except:
-            # If AST parsing fails, use basic string matching
-            import_lines = [line.strip() for line in code_snippet.split('\n') 
-                          if line.strip().startswith('import ') or line.strip().startswith('from ')]
-            imports = []
-            for line in import_lines:
-                if line.startswith('import '):
-                    imports.extend(name.strip().split('.')[0] 
-                                 for name in line[7:].split(','))
-                else:  # from ... import ...
-                    module = line.split('import')[0].replace('from', '').strip()
-                    imports.append(module.split('.')[0])
-            return list(set(imports))
+        """Extract top-level module names imported by code"""
+        return list(_extract_imports_cached(code_snippet))
+
+    def _compile(self, code_snippet):
+        """Compile a snippet, reusing the code object if it was compiled before."""
+        key = hashlib.blake2b(code_snippet.encode('utf-8'), digest_size=16).digest()
+        code_obj = self._code_cache.get(key)
+        if code_obj is None:
+            code_obj = compile(code_snippet, '<agent>', 'exec')
+            self._code_cache[key] = code_obj
+            if len(self._code_cache) > CODE_CACHE_SIZE:
+                self._code_cache.popitem(last=False)
+        else:
+            self._code_cache.move_to_end(key)
+        return code_obj
+
+    def _is_available(self, module):
+        """Check whether a module can be imported, without importing it."""
+        if module not in self._dep_cache:
+            try:
+                self._dep_cache[module] = importlib.util.find_spec(module) is not None
+            except (ImportError, ValueError):
+                self._dep_cache[module] = False
+        return self._dep_cache[module]
 
     def check_and_install_dependencies(self, code_snippet):
         """
@@ -87,15 +240,11 @@ class ToolsManager:
         required_imports = self.extract_imports_from_code(code_snippet)
         
         # Filter out standard library modules
-        standard_libs = set(sys.stdlib_module_names)
         missing_packages = []
         
         for module in required_imports:
-            if module not in standard_libs:
-                try:
-                    __import__(module)
-                except ImportError:
-                    missing_packages.append(module)
+            if module not in _STDLIB and not self._is_available(module):
+                missing_packages.append(module)
         
         if missing_packages:
             print(f"\nMissing required packages: {', '.join(missing_packages)}")
@@ -111,33 +260,41 @@ class ToolsManager:
                         except ImportError as e:
                             print(f"Warning: Package installed but import failed: {e}")
                             return False
+                        self._dep_cache[package] = True
                     else:
                         return False
                 return True
             return False
         return True
 
-    def format_stats(self, stats_dict):
-        return {k: f"{v:,.2f}" if isinstance(v, (int, float)) else v 
-                for k, v in stats_dict.items()}
-    
     def generate_descriptive_analysis(self, df, target_column, series_id_column):
         analysis = {}
         
+        keys = _series_keys(df, series_id_column)
+        
         # Overall dataset analysis
+        date_min, date_max = df['date'].agg(['min', 'max'])
         analysis['overall'] = {
-            'total_series': df[series_id_column].nunique(),
-            'date_range': [df['date'].min(), df['date'].max()],
-            'target_stats': self.format_stats(df[target_column].describe().to_dict())
+            'total_series': keys.nunique(),
+            'date_range': [date_min, date_max],
+            'target_stats': df[target_column].describe().astype(float).map(_FLOAT_FMT).to_dict()
         }
         
-        # Per series analysis
+        # Per series analysis: the describe() statistics from vectorized grouped
+        # reductions, since grouped describe() runs per group in Python.
+        # size counts rows (including nulls), count only non-null targets.
+        grouped = df[target_column].groupby(keys, sort=False, observed=True)
+        stats_df = grouped.agg(['size', 'count', 'mean', 'std', 'min', 'median', 'max']).rename(columns={'median': '50%'})
+        quartiles = grouped.quantile([.25, .75]).unstack()
+        stats_df['25%'] = quartiles[.25]
+        stats_df['75%'] = quartiles[.75]
+        lengths = stats_df.pop('size')
+        stats_df = stats_df[_DESCRIBE_STATS].astype(float).map(_FLOAT_FMT)
         analysis['per_series'] = {}
-        for series in df[series_id_column].unique():
-            series_df = df[df[series_id_column] == series]
+        for series, stats in stats_df.to_dict('index').items():
             analysis['per_series'][series] = {
-                'length': len(series_df),
-                'target_stats': self.format_stats(series_df[target_column].describe().to_dict())
+                'length': int(lengths[series]),
+                'target_stats': stats
             }
         
         return analysis
@@ -149,15 +306,16 @@ class ToolsManager:
         output.append(f"Date Range: {analysis['overall']['date_range'][0]} to {analysis['overall']['date_range'][1]}")
         
         output.append("\nOverall Target Statistics:")
-        stats_table = [[k, v] for k, v in analysis['overall']['target_stats'].items()]
-        output.append(tabulate(stats_table, headers=['Metric', 'Value'], tablefmt='grid'))
+        overall_stats = pd.Series(analysis['overall']['target_stats'], name='Value').rename_axis('Metric')
+        output.append(overall_stats.to_frame().to_markdown(tablefmt='grid'))
         
+        # One table for all series: a row per series, a column per statistic
         output.append("\n=== Per Series Analysis ===")
-        for series, data in analysis['per_series'].items():
-            output.append(f"\nSeries: {series}")
-            output.append(f"Number of records: {data['length']:,}")
-            stats_table = [[k, v] for k, v in data['target_stats'].items()]
-            output.append(tabulate(stats_table, headers=['Metric', 'Value'], tablefmt='grid'))
+        per_series = pd.DataFrame.from_dict({
+            series: {'records': f"{data['length']:,}", **data['target_stats']}
+            for series, data in analysis['per_series'].items()
+        }, orient='index').rename_axis('Series')
+        output.append(per_series.to_markdown(tablefmt='grid'))
         
         return "\n".join(output)
 
@@ -177,26 +335,44 @@ class ToolsManager:
         if df is None:
             return "No data available for forecasting. Please analyze a dataset first."
         
+        # Split once and ship each worker only its own slice
+        prophet_df = pd.DataFrame({'ds': pd.to_datetime(df['date']), 'y': df[target_column]})
+        keys = _series_keys(df, series_id_column)
+        groups = dict(iter(prophet_df.groupby(keys, sort=False, observed=True)))
+        
+        # Reuse models already fitted on identical data; only predict for those
         forecasts = {}
-        for series in df[series_id_column].unique():
-            series_df = df[df[series_id_column] == series].copy()
-            series_df['ds'] = pd.to_datetime(series_df['date'])
-            series_df['y'] = series_df[target_column]
-            
+        to_fit = {}
+        for series, fit_df in groups.items():
             try:
-                model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=True)
-                model.fit(series_df[['ds', 'y']])
-                
-                future = model.make_future_dataframe(periods=periods, freq='H')
-                forecast = model.predict(future)
-                
-                forecasts[series] = {
-                    'forecast': forecast.tail(periods)['yhat'].tolist(),
-                    'timestamps': forecast.tail(periods)['ds'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
-                }
+                key = _series_fingerprint(series, fit_df)
+                freq = _infer_freq(fit_df)
+            except Exception as e:  # e.g. non-numeric target; other series still run
+                forecasts[series] = f"Error forecasting: {str(e)}"
+                continue
+            model = self._prophet_cache.get(key)
+            if model is None:
+                to_fit[key] = (series, fit_df, freq)
+                continue
+            self._prophet_cache.move_to_end(key)
+            try:
+                forecasts[series] = _forecast_from_model(model, periods, freq)
             except Exception as e:
                 forecasts[series] = f"Error forecasting: {str(e)}"
         
+        results = Parallel(n_jobs=-1, prefer='processes')(
+            delayed(_fit_one_series)(series, fit_df, periods, freq)
+            for series, fit_df, freq in to_fit.values()
+        )
+        for key, (series, model, forecast) in zip(to_fit, results):
+            forecasts[series] = forecast
+            if model is not None:
+                self._prophet_cache[key] = model
+                if len(self._prophet_cache) > PROPHET_CACHE_SIZE:
+                    self._prophet_cache.popitem(last=False)
+        
+        forecasts = {series: forecasts[series] for series in groups}
+        
         return self.format_forecast_output(forecasts)
     
     def format_forecast_output(self, forecasts):
@@ -207,8 +383,9 @@ class ToolsManager:
             if isinstance(data, str):  # Error message
                 output.append(data)
             else:
-                forecast_table = [[ts, f"{val:,.2f}"] for ts, val in zip(data['timestamps'], data['forecast'])]
-                output.append(tabulate(forecast_table, headers=['Timestamp', 'Forecast'], tablefmt='grid'))
+                forecast_table = pd.DataFrame({'Timestamp': data['timestamps'], 'Forecast': data['forecast']})
+                forecast_table['Forecast'] = forecast_table['Forecast'].map(_FLOAT_FMT)
+                output.append(forecast_table.to_markdown(index=False, tablefmt='grid'))
         
         return "\n".join(output)
     
@@ -251,29 +428,34 @@ class ToolsManager:
                 debug_info['data_info'] = {
                     'shape': df.shape,
                     'columns': df.columns.tolist(),
-                    'dtypes': df.dtypes.to_dict(),
-                    'null_counts': df.isnull().sum().to_dict()
+                    'dtypes': df.dtypes.to_dict()
                 }
             
-            # Add imports to local namespace
-            local_vars = {'pd': pd, 'np': np}
+            # Snippets run in one namespace of their own, so functions they define
+            # see their imports and nothing from this module leaks in
+            namespace = {'pd': pd, 'np': np}
             if df is not None:
-                local_vars['df'] = df
-                if 'date' in df.columns:
-                    df['date'] = pd.to_datetime(df['date'])
+                namespace['df'] = df
+                if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+                    df['date'] = pd.to_datetime(df['date'], cache=True)
                     debug_info['execution_step'] = 'datetime conversion done'
             
             # Execute the code
+            debug_info['execution_step'] = 'compiling code'
+            code_obj = self._compile(code_snippet)
             debug_info['execution_step'] = 'executing code'
             f = io.StringIO()
             with redirect_stdout(f):
-                exec(code_snippet, globals(), local_vars)
+                exec(code_obj, namespace)
             output = f.getvalue()
             
             # Get results
             debug_info['execution_step'] = 'collecting results'
-            results = {k: v for k, v in local_vars.items() 
-                      if k not in ['df', 'pd', 'np'] and not k.startswith('__')}
+            results = namespace.get('__agent_result__')
+            if not isinstance(results, dict):
+                results = {k: v for k, v in namespace.items()
+                           if k not in _RESERVED and not k.startswith('_')
+                           and _result_size(v) < MAX_RESULT_BYTES}
             
             return {
                 'output': output,
@@ -282,6 +464,17 @@ class ToolsManager:
                 'debug_info': debug_info
             }
         except Exception as e:
+            # Null counts scan the whole frame, so only pay for them on failure.
+            # Counted column by column to avoid a full boolean frame; only
+            # columns that contain nulls are kept.
+            if debug_info['data_info']:
+                null_counts = {}
+                for col, values in df.items():
+                    count = int(np.count_nonzero(pd.isna(values.to_numpy())))
+                    if count:
+                        null_counts[col] = count
+                debug_info['data_info']['null_counts'] = null_counts
+            
             error_context = {
                 'error_type': type(e).__name__,
                 'error_msg': str(e),
@@ -289,21 +482,22 @@ class ToolsManager:
                 'traceback': traceback.format_exc()
             }
             
-            error_msg = f"Error executing code: {str(e)}\n"
-            error_msg += f"\nDebug Information:\n"
-            error_msg += f"Error Type: {error_context['error_type']}\n"
-            error_msg += f"Last Execution Step: {debug_info['execution_step']}\n"
-            if debug_info['data_info']:
-                error_msg += f"\nDataFrame Info:\n"
-                error_msg += f"Shape: {debug_info['data_info']['shape']}\n"
-                error_msg += f"Columns: {debug_info['data_info']['columns']}\n"
-                error_msg += f"Data Types:\n"
-                for col, dtype in debug_info['data_info']['dtypes'].items():
-                    error_msg += f"  {col}: {dtype}\n"
-                error_msg += f"Null Counts:\n"
-                for col, count in debug_info['data_info']['null_counts'].items():
-                    if count > 0:
-                        error_msg += f"  {col}: {count}\n"
+            parts = [
+                f"Error executing code: {str(e)}\n",
+                f"\nDebug Information:\n",
+                f"Error Type: {error_context['error_type']}\n",
+                f"Last Execution Step: {debug_info['execution_step']}\n"
+            ]
+            data_info = debug_info['data_info']
+            if data_info:
+                parts.append(f"\nDataFrame Info:\n")
+                parts.append(f"Shape: {data_info['shape']}\n")
+                parts.append(f"Columns: {data_info['columns']}\n")
+                parts.append(f"Data Types:\n")
+                parts.extend(f"  {col}: {dtype}\n" for col, dtype in data_info['dtypes'].items())
+                parts.append(f"Null Counts:\n")
+                parts.extend(f"  {col}: {count}\n" for col, count in data_info['null_counts'].items())
+            error_msg = "".join(parts)
             
             return {
                 'output': error_msg,
@@ -325,7 +519,7 @@ class ToolsManager:
                 for var_name, value in execution_result['results'].items():
                     output.append(f"\n{var_name}:")
                     if isinstance(value, pd.DataFrame):
-                        output.append(tabulate(value.head(), headers='keys', tablefmt='grid'))
+                        output.append(value.head().to_markdown(tablefmt='grid'))
                     else:
                         output.append(str(value))
         else: